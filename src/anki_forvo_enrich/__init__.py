@@ -14,7 +14,7 @@ import time
 
 from aqt import mw
 from aqt.qt import *
-from aqt.qt import QAction
+from aqt.qt import QAction, QWidget
 from aqt.utils import getText, showInfo, showWarning
 from aqt.operations import CollectionOp, QueryOp, OpChanges
 import requests
@@ -35,6 +35,16 @@ import logging
 
 from .batch_dialog import ForvoBatchDialog
 from .config import load_config, save_config
+from .pipeline import (
+    DEFAULT_CONCURRENCY,
+    JobResult,
+    WordJob,
+    apply_results,
+    clamp_concurrency,
+    read_jobs,
+    resolve_jobs,
+)
+from .transport import get_transport
 
 T = TypeVar('T', bound='Logger')
 
@@ -76,7 +86,8 @@ def show_error(msg: str, e: Optional[Exception] = None) -> None:
     if e:
         debug_print(f"Traceback:\n{''.join(traceback.format_tb(e.__traceback__))}")
     try:
-        showWarning(error_msg)
+        # May be called from pipeline worker threads
+        mw.taskman.run_on_main(lambda: showWarning(error_msg))
     except:
         debug_print("Failed to show warning dialog")
 
@@ -104,15 +115,21 @@ def get_word_versions(word: str, articles: Optional[List[str]] = None) -> List[s
 
     return list(filter(None, versions))  # Remove empty strings
 
-def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0) -> Optional[str]:
+def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0,
+                        articles: Optional[List[str]] = None, media_dir: Optional[str] = None) -> Optional[str]:
     """
     Fetch pronunciation from Forvo API
-    Returns audio URL if successful, None otherwise
+    Returns audio URL if successful, None otherwise.
+    Worker threads pass articles and media_dir so the config and collection
+    are not touched off the main thread.
     """
     try:
-        # Get config for articles
-        config = load_config()
-        articles = config.get('articles', {}).get(lang, [])
+        if articles is None:
+            # Get config for articles
+            config = load_config()
+            articles = config.get('articles', {}).get(lang, [])
+        if media_dir is None:
+            media_dir = mw.col.media.dir()
 
         # Try each version of the word
         for version in get_word_versions(word, articles):
@@ -124,7 +141,6 @@ def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0
 
             # Check if audio file already exists
             filename = f"{version}_{lang}.mp3"
-            media_dir = mw.col.media.dir()
             file_path = os.path.join(media_dir, filename)
 
             if os.path.exists(file_path):
@@ -134,7 +150,7 @@ def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0
             # Try Forvo API
             url = f"{FORVO_API_BASE}/key/{api_key}/format/json/action/word-pronunciations/word/{version}/language/{lang}"
             try:
-                response = requests.get(url)
+                response = get_transport().get(url)
                 response.raise_for_status()
                 data = response.json()
 
@@ -144,7 +160,7 @@ def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0
                     audio_url = best_pronunciation['pathmp3']
 
                     # Download and save the audio
-                    audio_tag = download_audio(audio_url, filename)
+                    audio_tag = download_audio(audio_url, filename, media_dir)
                     if audio_tag:
                         return audio_tag
             except requests.exceptions.HTTPError as e:
@@ -152,7 +168,7 @@ def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0
                     if retry_count == 0:  # Only retry once
                         debug_print("Rate limited, retrying once after 2 seconds...")
                         time.sleep(2)
-                        return fetch_pronunciation(word, lang, api_key, 1)
+                        return fetch_pronunciation(word, lang, api_key, 1, articles, media_dir)
                     else:
                         debug_print("Daily API limit reached!")
                         raise Exception("Daily Forvo API limit reached. Please try again tomorrow or use a different API key.")
@@ -163,7 +179,7 @@ def fetch_pronunciation(word: str, lang: str, api_key: str, retry_count: int = 0
         show_error(f"Error fetching pronunciation for {word}", e)
         return None
 
-def download_audio(url: str, filename: str) -> Optional[str]:
+def download_audio(url: str, filename: str, media_dir: Optional[str] = None) -> Optional[str]:
     """
     Download audio file and add it to Anki media collection
     Returns [sound:filename] tag if successful, None otherwise
@@ -173,13 +189,21 @@ def download_audio(url: str, filename: str) -> Optional[str]:
         if url.startswith('[sound:'):
             return url
 
-        response = requests.get(url)
-        response.raise_for_status()
-
         # Save to Anki media collection
-        media_dir = mw.col.media.dir()
+        if media_dir is None:
+            media_dir = mw.col.media.dir()
         file_path = os.path.join(media_dir, filename)
 
+        transport = get_transport()
+        response = transport.get(url, conditional=True)
+        if response.status_code == 304:
+            if os.path.exists(file_path):
+                return f"[sound:{filename}]"
+            # Unchanged upstream but our copy is gone, fetch it again
+            transport.forget(url)
+            response = transport.get(url)
+        response.raise_for_status()
+
         with open(file_path, 'wb') as f:
             f.write(response.content)
 
@@ -204,66 +228,179 @@ class ForvoEnricher:
             )
         )
 
+    def build_field(self, word: str, audio_tag: str) -> str:
+        """Field content after enrichment: the plain word followed by its sound tag"""
+        return f"{strip_html(word)} {audio_tag}"
+
+    def resolve_job(self, job: WordJob, api_key: str, lang: str, articles: List[str], media_dir: str) -> JobResult:
+        """Look up and download audio for one job. Safe to call from worker threads."""
+        try:
+            if self.should_stop:
+                return JobResult(job.note_id, job.word, None, "Stopped")
+            audio_tag = fetch_pronunciation(job.word, lang, api_key, articles=articles, media_dir=media_dir)
+            if not audio_tag:
+                return JobResult(job.note_id, job.word, None, "No pronunciation found")
+            return JobResult(job.note_id, job.word, audio_tag, "Enriched")
+        except Exception as e:
+            debug_print(f"Error enriching note {job.note_id}: {str(e)}")
+            return JobResult(job.note_id, job.word, None, f"Error: {str(e)}")
+
     def enrich_single_note(self, col: Collection, note_id: NoteId, api_key: str, lang: str, target_field: str = "Front") -> Tuple[bool, str]:
         """
         Enrich a single note with Forvo audio. Returns (success, message).
         """
         try:
-            note = col.get_note(note_id)
-            word = note[target_field] if target_field in note else ""
-            if not word:
-                return False, "No word in field"
-            if '[sound:' in word:
-                return False, "Already has audio"
-            audio_url = fetch_pronunciation(word, lang, api_key)
-            if not audio_url:
-                return False, "No pronunciation found"
-            note[target_field] = f"{strip_html(word)} {audio_url}"
-            col.update_note(note)
-            return True, "Enriched"
+            jobs, skipped = read_jobs(col, [note_id], target_field)
+            if skipped:
+                return False, skipped[0].message
+            config = load_config()
+            articles = config.get('articles', {}).get(lang, [])
+            get_transport().configure(config)
+            result = self.resolve_job(jobs[0], api_key, lang, articles, col.media.dir())
+            if not result.audio_tag:
+                return False, result.message
+            apply_results(col, [result], target_field, self.build_field)
+            return True, result.message
         except Exception as e:
             debug_print(f"Error enriching note {note_id}: {str(e)}")
             return False, f"Error: {str(e)}"
 
+    def _resolve_stage(self, jobs: List[WordJob], done_before: int, total_notes: int, api_key: str, lang: str,
+                       articles: List[str], media_dir: str, concurrency: int,
+                       progress_callback: Optional[Callable[[NoteId, int, bool, str], None]]) -> List[JobResult]:
+        """Run lookups and downloads on the worker pool; never touches the collection"""
+        found = 0
+
+        def on_result(result: JobResult, completed: int) -> None:
+            nonlocal found
+            if result.audio_tag:
+                found += 1
+            idx = done_before + completed - 1
+            self.update_progress(
+                f"Found audio for {found} of {len(jobs)} words, {completed} looked up.",
+                value=idx + 1,
+                max=total_notes
+            )
+            if progress_callback:
+                # marshal UI updates to the main thread
+                mw.taskman.run_on_main(lambda nid=result.note_id, i=idx, ok=bool(result.audio_tag), message=result.message: progress_callback(nid, i, ok, message))
+
+        debug_print(f"Resolving {len(jobs)} words with {concurrency} workers")
+        return resolve_jobs(
+            jobs,
+            lambda job: self.resolve_job(job, api_key, lang, articles, media_dir),
+            concurrency=concurrency,
+            should_stop=lambda: self.should_stop,
+            on_result=on_result,
+        )
+
+    def _apply_stage(self, col: Collection, results: List[JobResult], total_notes: int, target_field: str) -> OpChanges:
+        """Write resolved audio to the notes and record the summary message"""
+        processed = apply_results(col, results, target_field, self.build_field)
+        errors = total_notes - processed
+        debug_print(f"Finished processing. Success: {processed}, Errors: {errors}")
+        debug_print(f"Connections: {get_transport().format_stats()}")
+        status = "stopped by user" if self.should_stop else "completed"
+        self.last_operation_message = f"Process {status}. Added Forvo pronunciations to {processed}/{total_notes} notes. Errors: {errors}"
+        return OpChanges()
+
+    def _report_skipped(self, skipped: List[JobResult],
+                        progress_callback: Optional[Callable[[NoteId, int, bool, str], None]]) -> None:
+        if progress_callback:
+            for idx, result in enumerate(skipped):
+                mw.taskman.run_on_main(lambda nid=result.note_id, i=idx, message=result.message: progress_callback(nid, i, False, message))
+
     def process_notes(self, col: Collection, note_ids: List[NoteId], api_key: str, lang: str, progress_callback: Optional[Callable[[NoteId, int, bool, str], None]] = None) -> OpChanges:
-        """Process notes in the collection"""
+        """
+        Process notes in the collection, running every pipeline stage in the
+        calling thread. The GUI uses run_batch() instead so the collection is
+        released while words are looked up.
+        """
         try:
             self.is_processing = True
             self.should_stop = False
             total_notes = len(note_ids)
             debug_print(f"Starting to process {total_notes} notes")
-            processed = 0
-            errors = 0
-            target_field = load_config().get('target_field', 'Front')
-            for i, note_id in enumerate(note_ids):
-                if self.should_stop:
-                    debug_print("Process stopped by user")
-                    break
-                success, msg = self.enrich_single_note(col, note_id, api_key, lang, target_field)
-                if success:
-                    processed += 1
-                else:
-                    errors += 1
-                self.update_progress(
-                    f"Processed {processed} of {total_notes} notes, with {errors} errors.",
-                    value=i + 1,
-                    max=total_notes
-                )
-                if progress_callback:
-                    # marshal UI updates to the main thread
-                    mw.taskman.run_on_main(lambda nid=note_id, idx=i, ok=success, message=msg: progress_callback(nid, idx, ok, message))
-            debug_print(f"Finished processing. Success: {processed}, Errors: {errors}")
-            status = "stopped by user" if self.should_stop else "completed"
-            self.last_operation_message = f"Process {status}. Added Forvo pronunciations to {processed}/{total_notes} notes. Errors: {errors}"
+            config = load_config()
+            target_field = config.get('target_field', 'Front')
+            articles = config.get('articles', {}).get(lang, [])
+            concurrency = clamp_concurrency(config.get('concurrency', DEFAULT_CONCURRENCY))
+            get_transport().configure(config)
+            jobs, skipped = read_jobs(col, note_ids, target_field)
+            self._report_skipped(skipped, progress_callback)
+            results = self._resolve_stage(jobs, len(skipped), total_notes, api_key, lang, articles,
+                                          col.media.dir(), concurrency, progress_callback)
+            changes = self._apply_stage(col, results, total_notes, target_field)
             self.is_processing = False
             self.should_stop = False
-            return OpChanges()
+            return changes
         except Exception as e:
             self.is_processing = False
             self.should_stop = False
             debug_print(f"Fatal error during note processing: {str(e)}")
             raise
 
+    def run_batch(self, parent: QWidget, note_ids: List[NoteId], api_key: str, lang: str,
+                  on_success: Callable[[OpChanges], None], on_failure: Callable[[Exception], None],
+                  progress_callback: Optional[Callable[[NoteId, int, bool, str], None]] = None) -> None:
+        """
+        Enrich notes as a staged pipeline: a QueryOp reads the words, a
+        background task resolves them on the worker pool, and a CollectionOp
+        writes the results. The collection is free while lookups run.
+        """
+        config = load_config()
+        target_field = config.get('target_field', 'Front')
+        articles = config.get('articles', {}).get(lang, [])
+        concurrency = clamp_concurrency(config.get('concurrency', DEFAULT_CONCURRENCY))
+        media_dir = mw.col.media.dir()
+        get_transport().configure(config)
+        total_notes = len(note_ids)
+        self.is_processing = True
+        self.should_stop = False
+        debug_print(f"Starting to process {total_notes} notes")
+
+        def fail(exc: Exception) -> None:
+            self.is_processing = False
+            self.should_stop = False
+            debug_print(f"Fatal error during note processing: {str(exc)}")
+            on_failure(exc)
+
+        def on_written(changes: OpChanges) -> None:
+            self.is_processing = False
+            self.should_stop = False
+            on_success(changes)
+
+        def on_resolved(future: Any) -> None:
+            try:
+                results = future.result()
+            except Exception as exc:
+                fail(exc)
+                return
+            op = CollectionOp(
+                parent=parent,
+                op=lambda col: self._apply_stage(col, results, total_notes, target_field)
+            )
+            op.success(on_written)
+            op.failure(fail)
+            op.run_in_background()
+
+        def on_read(read: Tuple[List[WordJob], List[JobResult]]) -> None:
+            jobs, skipped = read
+            self._report_skipped(skipped, progress_callback)
+            mw.taskman.run_in_background(
+                lambda: self._resolve_stage(jobs, len(skipped), total_notes, api_key, lang, articles,
+                                            media_dir, concurrency, progress_callback),
+                on_resolved
+            )
+
+        op = QueryOp(
+            parent=parent,
+            op=lambda col: read_jobs(col, note_ids, target_field),
+            success=on_read
+        )
+        op.failure(fail)
+        op.run_in_background()
+
     def enrich_notes(self) -> None:
         """Main function to enrich notes with Forvo pronunciations"""
         if self.is_processing:
@@ -350,14 +487,8 @@ class ForvoEnricher:
                     mw.progress.finish()
                     showWarning(f"Error during processing: {str(exc)}")
 
-                # Use CollectionOp for proper handling of collection operations
-                op = CollectionOp(
-                    parent=mw,
-                    op=lambda col: self.process_notes(col, note_ids, api_key, lang)
-                )
-                op.success(on_process_success)
-                op.failure(on_process_error)
-                op.run_in_background()
+                # Collection is only held while reading words and writing results
+                self.run_batch(mw, note_ids, api_key, lang, on_process_success, on_process_error)
 
             # Use QueryOp for searching notes
             op = QueryOp(
@@ -106,7 +106,6 @@ class ForvoBatchDialog(QDialog):
     def start_enrichment(self):
         """Enrich all currently listed notes with progress and feedback."""
         from aqt.utils import showInfo, showWarning
-        from aqt.operations import CollectionOp
         from . import enricher
         # Must have search results
         note_ids = getattr(self, 'current_note_ids', [])
@@ -148,21 +147,13 @@ class ForvoBatchDialog(QDialog):
             row = row_index_by_nid.get(nid)
             if row is None:
                 return
-            # Update audio and status cells
-            target_field = self.target_field
-            note = mw.col.get_note(nid)
-            text = note[target_field] if target_field in note else ""
-            has_audio = '[sound:' in text
-            self.results_table.setItem(row, 1, QTableWidgetItem("Yes" if has_audio else "No"))
+            # Notes are written once all lookups finish, so mark found audio
+            # from the result instead of re-reading the note
+            if ok:
+                self.results_table.setItem(row, 1, QTableWidgetItem("Yes"))
             self.results_table.setItem(row, 3, QTableWidgetItem(message))
 
-        op = CollectionOp(
-            parent=mw,
-            op=lambda col: enricher.process_notes(col, note_ids, api_key, lang, progress_callback)
-        )
-        op.success(on_success)
-        op.failure(on_failure)
-        op.run_in_background()
+        enricher.run_batch(self, note_ids, api_key, lang, on_success, on_failure, progress_callback)
 
     def enrich_single_note(self, nid, row):
         from . import enricher
@@ -0,0 +1,121 @@
+"""
+Staged enrichment pipeline.
+
+Enrichment is split into three stages so the collection is only needed while
+reading words and writing results:
+
+1. read    - collect the target field of every note (needs the collection)
+2. resolve - Forvo lookups and audio downloads on a bounded worker pool
+3. apply   - write the resolved audio tags back to the notes (needs the collection)
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from anki.collection import Collection, NoteId
+
+DEFAULT_CONCURRENCY: int = 4
+MAX_CONCURRENCY: int = 16
+
+
+class WordJob(NamedTuple):
+    """A note waiting for audio, as read from the collection"""
+    note_id: NoteId
+    word: str
+
+
+class JobResult(NamedTuple):
+    """Outcome of resolving a single job; audio_tag is None on failure"""
+    note_id: NoteId
+    word: str
+    audio_tag: Optional[str]
+    message: str
+
+
+def clamp_concurrency(value: Any) -> int:
+    """Coerce a configured concurrency level into a sane worker count"""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_CONCURRENCY
+    return max(1, min(level, MAX_CONCURRENCY))
+
+
+def read_jobs(col: Collection, note_ids: Sequence[NoteId], target_field: str) -> Tuple[List[WordJob], List[JobResult]]:
+    """
+    Read stage. Returns the notes that still need audio, and a result for
+    every note skipped because its field is empty or already has audio.
+    """
+    jobs: List[WordJob] = []
+    skipped: List[JobResult] = []
+    for note_id in note_ids:
+        note = col.get_note(note_id)
+        word = note[target_field] if target_field in note else ""
+        if not word:
+            skipped.append(JobResult(note_id, word, None, "No word in field"))
+        elif '[sound:' in word:
+            skipped.append(JobResult(note_id, word, None, "Already has audio"))
+        else:
+            jobs.append(WordJob(note_id, word))
+    return jobs, skipped
+
+
+def resolve_jobs(
+    jobs: Sequence[WordJob],
+    resolve: Callable[[WordJob], JobResult],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_result: Optional[Callable[[JobResult, int], None]] = None,
+) -> List[JobResult]:
+    """
+    Resolve stage. Runs `resolve` for every job on a pool of `concurrency`
+    workers without touching the collection. At most `concurrency` jobs are in
+    flight, so a stop request only has to wait for those. `on_result` is called
+    from the calling thread with each result and the number completed so far.
+    """
+    results: List[JobResult] = []
+    pending: Set["Future[JobResult]"] = set()
+    queue = iter(jobs)
+    exhausted = False
+
+    def stopped() -> bool:
+        return bool(should_stop and should_stop())
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="forvo") as pool:
+        while True:
+            while not exhausted and not stopped() and len(pending) < concurrency:
+                job = next(queue, None)
+                if job is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(resolve, job))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result, len(results))
+    return results
+
+
+def apply_results(col: Collection, results: Sequence[JobResult], target_field: str,
+                  build_field: Callable[[str, str], str]) -> int:
+    """
+    Apply stage. Writes every resolved audio tag to its note and returns the
+    number of notes updated. Notes that gained audio since the read stage are
+    left alone.
+    """
+    updated = 0
+    for result in results:
+        if not result.audio_tag:
+            continue
+        note = col.get_note(result.note_id)
+        current = note[target_field] if target_field in note else ""
+        if not current or '[sound:' in current:
+            continue
+        note[target_field] = build_field(current, result.audio_tag)
+        col.update_note(note)
+        updated += 1
+    return updated
+
@@ -0,0 +1,121 @@
+"""
+Shared HTTP transport for Forvo API lookups and audio downloads.
+
+All requests go through one requests.Session so connections to
+apifree.forvo.com and the audioNN.forvo.com hosts are kept alive and reused
+by the pipeline workers. Every request has connect/read timeouts, and audio
+fetches are revalidated with ETag/Last-Modified when a URL is seen again.
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CONNECT_TIMEOUT: float = 5.0
+DEFAULT_READ_TIMEOUT: float = 20.0
+# Enough idle connections per host for every pipeline worker
+POOL_MAXSIZE: int = 16
+POOL_HOSTS: int = 8
+USER_AGENT: str = "anki-forvo-enrich"
+
+
+class Transport:
+    def __init__(self, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT) -> None:
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapter = adapter
+        self._lock = threading.Lock()
+        # url -> (etag, last_modified) from the last successful fetch
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        # host -> [requests, new connections] carried over from pools that were closed
+        self._retired: Dict[str, Tuple[int, int]] = {}
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Apply timeouts from the add-on config"""
+        self.connect_timeout = float(config.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT))
+        self.read_timeout = float(config.get('read_timeout', DEFAULT_READ_TIMEOUT))
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    def get(self, url: str, conditional: bool = False, stream: bool = False) -> requests.Response:
+        """
+        GET a URL on a pooled connection. With conditional=True the request
+        carries If-None-Match/If-Modified-Since from the previous fetch of the
+        same URL, and a 304 response is returned as is.
+        """
+        headers: Dict[str, str] = {}
+        if conditional:
+            with self._lock:
+                etag, last_modified = self._validators.get(url, (None, None))
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+        if conditional and response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                with self._lock:
+                    self._validators[url] = (etag, last_modified)
+        return response
+
+    def forget(self, url: str) -> None:
+        """Drop cached validators, e.g. when the local copy of a download is gone"""
+        with self._lock:
+            self._validators.pop(url, None)
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-host request and connection counts. `reused` is the number of
+        requests that were served on an already open connection.
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+        for host, (req, conns) in self._retired.items():
+            stats[host] = {"requests": req, "connections": conns}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = stats.setdefault(pool.host, {"requests": 0, "connections": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+        for entry in stats.values():
+            entry["reused"] = max(0, entry["requests"] - entry["connections"])
+        return stats
+
+    def format_stats(self) -> str:
+        parts = [
+            f"{host}: {entry['requests']} requests on {entry['connections']} connections ({entry['reused']} reused)"
+            for host, entry in sorted(self.connection_stats().items())
+        ]
+        return "; ".join(parts) if parts else "no requests"
+
+    def close(self) -> None:
+        """Close all pooled connections, keeping their counts for connection_stats()"""
+        for host, entry in self.connection_stats().items():
+            self._retired[host] = (entry["requests"], entry["connections"])
+        self.session.close()
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """The add-on wide transport, created on first use"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport